@@ -6,7 +6,60 @@
 # @Description : 搜索同级文件夹下BOM_开头的CSV/Excel文件，筛选包含指定关键词的文件，返回匹配结果并汇总，同时处理文件读取异常
 
 import os
-import pandas as pd
+import re
+import mmap
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+from openpyxl import load_workbook
+
+# 需要搜索的BOM文件后缀（不含点），覆盖常见的BOM文件格式
+BOM_FILE_SUFFIXES = frozenset({'csv', 'xlsx'})
+# 可能出现在数值单元格中的关键词（只含数字、小数点、正负号及科学计数法字符）；数值不存放在sharedStrings.xml中
+NUMERIC_KEYWORD_PATTERN = re.compile(r'[0-9.eE+-]+')
+
+def file_contains_keyword(file_full_path, search_keyword):
+    """
+    检查单个BOM文件中是否包含指定关键词（供进程池并行调用，读取失败时直接抛出异常）
+    :param file_full_path: BOM文件完整路径（.csv/.xlsx）
+    :param search_keyword: 要搜索的关键词
+    :return: 包含关键词返回True，否则返回False
+    """
+    # 直接在原始字节上匹配关键词（按字面量匹配，不作为正则解释），无需解析表格结构
+    if file_full_path.endswith(".csv"):
+        # CSV为纯文本，以只读内存映射方式直接搜索文件字节，无需把整个文件复制到内存
+        csv_pattern = re.compile(re.escape(search_keyword.encode('utf-8')))
+        with open(file_full_path, 'rb') as f:
+            # 空文件无法建立内存映射，且必然不含关键词
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return csv_pattern.search(data) is not None
+
+    # xlsx本质为zip包，字符串单元格内容通常集中存放在xl/sharedStrings.xml中
+    with zipfile.ZipFile(file_full_path) as zf:
+        shared_strings = (zf.read('xl/sharedStrings.xml')
+                          if 'xl/sharedStrings.xml' in zf.namelist() else None)
+    if shared_strings is not None:
+        # sharedStrings.xml中&、<、>等字符以XML实体形式存储，需先转义再匹配
+        xlsx_pattern = re.compile(re.escape(escape(search_keyword).encode('utf-8')))
+        if xlsx_pattern.search(shared_strings) is not None:
+            return True
+        # 未命中时，只有富文本单元格（文字拆分在多个<r><t>片段中）或数值单元格（存放在工作表XML中）仍可能包含关键词
+        # 两者都不可能时直接判定不包含，否则回退为逐行检查
+        if b'<r>' not in shared_strings and not NUMERIC_KEYWORD_PATTERN.fullmatch(search_keyword):
+            return False
+
+    # 部分工具以内联字符串写入单元格（无sharedStrings.xml），或字节匹配无法确定结果时，回退为只读模式逐行流式检查
+    wb = load_workbook(file_full_path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            for row in ws.iter_rows(values_only=True):
+                if any(search_keyword in str(c) for c in row if c is not None):
+                    return True
+        return False
+    finally:
+        wb.close()
 
 def search_specific_content_in_bom_files(search_keyword):
     """
@@ -19,39 +72,39 @@ def search_specific_content_in_bom_files(search_keyword):
     # 存储符合条件的文件名
     target_files = []
 
-    # 遍历当前文件夹下的所有同级子文件夹
-    for folder_name in os.listdir(current_dir):
-        folder_path = os.path.join(current_dir, folder_name)
-        # 只处理文件夹，跳过文件和隐藏目录（可选，避免处理.开头的系统目录）
-        if os.path.isdir(folder_path) and not folder_name.startswith('.'):
-            # 遍历子文件夹内的文件
-            for file_name in os.listdir(folder_path):
-                # 筛选“BOM_开头 + .csv/.xlsx后缀”的文件，覆盖常见的BOM文件格式
-                if file_name.startswith("BOM_") and (file_name.endswith(".csv") or file_name.endswith(".xlsx")):
-                    file_full_path = os.path.join(folder_path, file_name)
-                    try:
-                        # 根据文件后缀选择对应的读取方法
-                        if file_name.endswith(".csv"):
-                            # 读取CSV文件，不指定表头，全量读取（避免表头干扰关键词搜索）
-                            df = pd.read_csv(file_full_path, header=None, encoding='utf-8', errors='ignore')
-                        else:  # .xlsx
-                            df = pd.read_excel(file_full_path, header=None)
+    # 先收集当前文件夹下所有同级子文件夹中的候选文件
+    candidate_files = []
+    with os.scandir(current_dir) as folders:
+        for folder in folders:
+            # 只处理文件夹，跳过文件和隐藏目录（可选，避免处理.开头的系统目录）
+            if folder.is_dir() and not folder.name.startswith('.'):
+                # 遍历子文件夹内的文件
+                with os.scandir(folder.path) as files:
+                    for file in files:
+                        file_name = file.name
+                        # 筛选“BOM_开头 + .csv/.xlsx后缀”的文件：从右侧切出一次后缀，查集合即可
+                        if file_name.startswith("BOM_") and file_name.rpartition('.')[2] in BOM_FILE_SUFFIXES:
+                            candidate_files.append((file_name, file.path))
 
-                        # 检查文件中是否存在包含指定关键词的单元格
-                        # 先将所有单元格转为字符串，再检查是否包含关键词
-                        has_keyword = df.apply(
-                            lambda row: row.astype(str).str.contains(search_keyword, na=False).any(),
-                            axis=1
-                        ).any()
+    # 无候选文件时直接返回，不启动进程池
+    if not candidate_files:
+        return target_files
 
-                        if has_keyword:
-                            # 可以选择存储完整路径或仅文件名，这里保留文件名，也可改为file_full_path
-                            target_files.append(file_name)
-                            print(f"找到匹配文件：{file_name}（路径：{file_full_path}）")
+    # 各文件相互独立，使用进程池并行检查；按提交顺序取回结果，保证输出顺序稳定
+    # 进程数不超过候选文件数，避免启动多余的解释器进程
+    with ProcessPoolExecutor(max_workers=min(len(candidate_files), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(file_contains_keyword, file_full_path, search_keyword)
+                   for _, file_full_path in candidate_files]
+        for (file_name, file_full_path), future in zip(candidate_files, futures):
+            try:
+                if future.result():
+                    # 可以选择存储完整路径或仅文件名，这里保留文件名，也可改为file_full_path
+                    target_files.append(file_name)
+                    print(f"找到匹配文件：{file_name}（路径：{file_full_path}）")
 
-                    except Exception as e:
-                        print(f"读取文件{file_full_path}失败：{str(e)}")
-                        continue
+            except Exception as e:
+                print(f"读取文件{file_full_path}失败：{str(e)}")
+                continue
 
     return target_files
 
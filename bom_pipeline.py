@@ -0,0 +1,263 @@
+# Python env   : Python 3.8+（需支持 pathlib、f-string 及 pandas/openpyxl 最新 API）
+# -*- coding: utf-8 -*-
+# @Time    : 2025/12/13 下午6:35
+# @Author  : 李清水
+# @File    : bom_pipeline.py
+# @Description : BOM自采器件与ModAcc配件清单的公共处理流程（extract_bom_components.py、modacc_accessory_processor.py共用）
+#                核心功能：搜索文件→并行读取并筛选自采数据→按模块汇总总价→生成模块汇总表（合并单元格+模块交替色）与去重类型表（奇偶行交替色）
+#                直接运行本文件时，在同一进程中依次完成BOM与ModAcc两项处理，只需导入一次pandas/openpyxl
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from openpyxl.styles import PatternFill, Alignment, Side, Border, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+# 中文字符正则（按2个字符宽度计算列宽）
+CJK_CHAR_REGEX = r'[\u4e00-\u9fff]'
+
+# 样式配置：细边框 + 居中
+THIN_BORDER = Border(
+    left=Side(style='thin'), right=Side(style='thin'),
+    top=Side(style='thin'), bottom=Side(style='thin')
+)
+CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+# 背景色：模块汇总表同一模块同色、不同模块交替（浅蓝→浅绿→浅黄循环）；去重类型表奇偶行交替
+TABLE_COLORS = {
+    'module_table': ["E6F3FF", "F0F8E6", "FFF9E6"],  # 浅蓝、浅绿、浅黄
+    'type_table': ["F5F5F5", "FFFFFF"]  # 浅灰（偶数行）、白色（奇数行）
+}
+
+def build_named_styles(table):
+    """
+    生成指定表格的命名样式列表（背景色+边框+居中合为一个样式，工作簿样式表中只登记一次，单元格按名称引用）
+    显式指定默认字体，避免生成无字体名/字号的空字体记录
+    :param table: 表格类型（'module_table' 或 'type_table'）
+    :return: NamedStyle列表（顺序与TABLE_COLORS[table]一致）
+    """
+    return [NamedStyle(name=f'{table}_{idx}', font=DEFAULT_FONT, border=THIN_BORDER, alignment=CENTER_ALIGNMENT,
+                       fill=PatternFill(start_color=color, end_color=color, fill_type="solid"))
+            for idx, color in enumerate(TABLE_COLORS[table])]
+
+def calc_column_widths(df):
+    """
+    按DataFrame内容计算各列显示宽度（中文占2个字符宽度，英文/数字占1个字符，含表头）
+    :param df: 待写入Excel的DataFrame
+    :return: 各列最大显示宽度列表（顺序与df.columns一致）
+    """
+    widths = []
+    for col in df.columns:
+        # 整列转为字符串后向量化计算：字符数 + 中文字符数
+        text = df[col].fillna('').astype(str)
+        cell_widths = text.str.len() + text.str.count(CJK_CHAR_REGEX)
+        header = str(col)
+        header_width = len(header) + len(re.findall(CJK_CHAR_REGEX, header))
+        widths.append(max(header_width, int(cell_widths.max()) if len(text) else 0))
+    return widths
+
+def calc_module_ranges(module_names):
+    """
+    根据模块名称列计算每个模块在Excel中的行区间（数据已按模块排序，相同模块连续）
+    :param module_names: 模块名称列（Series，顺序与写入Excel的行顺序一致）
+    :return: 模块行区间列表 [(起始行, 结束行), ...]，行号为Excel行号（第1行为表头）
+    """
+    values = module_names.to_numpy()
+    if len(values) == 0:
+        return []
+    # 相邻两行模块名不同的位置即为新模块的起点
+    change_idx = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.r_[0, change_idx]
+    ends = np.r_[change_idx - 1, len(values) - 1]
+    # 数据第0行对应Excel第2行
+    return [(int(start) + 2, int(end) + 2) for start, end in zip(starts, ends)]
+
+def find_module_files(root_dir, file_pattern):
+    """
+    递归搜索根目录及子目录下文件名匹配的文件
+    :param root_dir: 搜索根目录
+    :param file_pattern: 预编译的文件名正则，第1个分组即模块名
+    :return: 文件列表 [(文件完整路径, 文件名, 模块名称), ...]
+    """
+    matched_files = []
+    for dir_path, _, file_names in os.walk(root_dir):
+        for file_name in file_names:
+            file_match = file_pattern.match(file_name)
+            if file_match:
+                # 模块名直接取文件名匹配结果的第1个分组，同样支持 [-_]v 两种分隔符
+                matched_files.append((os.path.join(dir_path, file_name), file_name, file_match.group(1)))
+    return matched_files
+
+def read_module_data(file_path, file_name, module_name, core_columns, filter_columns, numeric_cols, log_formats):
+    """
+    读取单个文件并筛选自采数据（供线程池并行调用，日志以列表形式返回，由主线程按顺序输出）
+    :param file_path: 文件完整路径
+    :param file_name: 文件名
+    :param module_name: 模块名称（从文件名提取）
+    :param core_columns: 核心列（缺少则跳过文件）
+    :param filter_columns: 自采标识列（任一列非空即视为自采）
+    :param numeric_cols: 需转换为数值的列（空值填充为0）
+    :param log_formats: 日志格式字典（键：found/missing/empty/done/error）
+    :return: (带“模块名称”列的自采数据DataFrame，无数据或处理失败时为None, 日志列表)
+    """
+    messages = [log_formats['found'].format(path=file_path)]
+    try:
+        # 按字符串格式读取，且只解析核心列（列名去除首尾空格后比较），其余列不转为DataFrame数据
+        df = pd.read_excel(file_path, dtype=str, header=0,
+                           usecols=lambda col: str(col).strip() in core_columns)
+        df.columns = df.columns.str.strip()
+
+        missing_cols = [col for col in core_columns if col not in df.columns]
+        if missing_cols:
+            messages.append(log_formats['missing'].format(file_name=file_name, missing_cols=missing_cols))
+            return None, messages
+
+        # 空值视为空字符串，去除首尾空格后任一筛选列非空即保留（逐列向量化，一次按行归约）
+        stripped = df[filter_columns].fillna('').apply(lambda s: s.str.strip())
+        mask = (stripped != '').any(axis=1)
+        # 行筛选与核心列选取合并为一次切片，不再整表复制
+        df_filtered = df.loc[mask, core_columns]
+
+        if df_filtered.empty:
+            messages.append(log_formats['empty'].format(file_name=file_name))
+            return None, messages
+
+        # 处理数值列（assign一次性生成新表，替代多次中间复制）
+        df_with_module = df_filtered.assign(**{
+            col: pd.to_numeric(df_filtered[col], errors='coerce').fillna(0)
+            for col in numeric_cols
+        })
+        df_with_module.insert(0, '模块名称', module_name)
+        messages.append(log_formats['done'].format(file_name=file_name, count=len(df_with_module)))
+        return df_with_module, messages
+
+    except Exception as e:
+        messages.append(log_formats['error'].format(file_name=file_name, error=str(e)))
+        return None, messages
+
+def read_all_module_data(matched_files, core_columns, filter_columns, numeric_cols, log_formats):
+    """
+    使用线程池并行读取所有文件，按文件遍历顺序输出日志并收集自采数据
+    :param matched_files: find_module_files返回的文件列表
+    :return: 各文件的自采数据DataFrame列表（已跳过无数据或处理失败的文件）
+    """
+    all_data = []
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(read_module_data, file_path, file_name, module_name,
+                                   core_columns, filter_columns, numeric_cols, log_formats)
+                   for file_path, file_name, module_name in matched_files]
+        # 按提交顺序取回结果并输出日志，保证输出顺序与文件遍历顺序一致
+        for future in futures:
+            df_with_module, messages = future.result()
+            for message in messages:
+                print(message)
+            if df_with_module is not None:
+                all_data.append(df_with_module)
+    return all_data
+
+def combine_with_module_totals(all_data, sort_by, total_col):
+    """
+    合并所有文件的自采数据，按模块排序，并计算模块总价（作为第2列插入）
+    :param all_data: 各文件的自采数据DataFrame列表
+    :param sort_by: 排序列（首列应为“模块名称”，保证相同模块连续）
+    :param total_col: 模块总价列名
+    :return: 合并后的DataFrame
+    """
+    df_total = pd.concat(all_data, ignore_index=True).sort_values(by=sort_by, ignore_index=True)
+    # transform直接将模块总价广播到该模块的所有行，无需再与汇总表合并
+    df_total.insert(1, total_col, df_total.groupby('模块名称')['Value'].transform('sum'))
+    return df_total
+
+def style_header(ws, max_col, bold_header):
+    """
+    表头样式：边框+居中（可选加粗）
+    """
+    for col in range(1, max_col + 1):
+        header_cell = ws.cell(row=1, column=col)
+        if bold_header:
+            header_cell.font = header_cell.font.copy(bold=True)
+        header_cell.border = THIN_BORDER
+        header_cell.alignment = CENTER_ALIGNMENT
+
+def write_module_table(df, file_path, sheet_name, width_factor, bold_header=False):
+    """
+    生成按模块汇总表：合并模块名称列与模块总价列（前2列），同一模块同色、不同模块交替
+    :param df: 已按模块排序的汇总数据（combine_with_module_totals的结果）
+    :param file_path: 输出文件路径
+    :param sheet_name: 工作表名称
+    :param width_factor: 列宽系数（显示宽度 × 系数）
+    :param bold_header: 表头是否加粗
+    """
+    # 写入Excel（不包含索引），在with块内直接对写入器内存中的工作簿设置样式，退出时一次性写盘
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+        wb = writer.book
+        ws = writer.sheets[sheet_name]
+        max_col = ws.max_column
+
+        # 合并相同模块的单元格（行区间直接由DataFrame的模块名称列计算，无需逐行读取单元格）
+        module_ranges = calc_module_ranges(df['模块名称'])
+        for (start_row, end_row) in module_ranges:
+            # 只有一行的模块无需合并（合并单行区域只会在文件中写入无意义的合并记录）
+            if end_row == start_row:
+                continue
+            # 直接传行列号合并，免去坐标字符串的拼接与解析
+            ws.merge_cells(start_row=start_row, end_row=end_row, start_column=1, end_column=1)  # 模块名称列
+            ws.merge_cells(start_row=start_row, end_row=end_row, start_column=2, end_column=2)  # 模块总价列
+
+        # 按模块行范围统一颜色+边框+居中（一次赋值命名样式）
+        styles = build_named_styles('module_table')
+        for style in styles:
+            wb.add_named_style(style)
+        for color_idx, (start_row, end_row) in enumerate(module_ranges):
+            current_style = styles[color_idx % len(styles)].name
+            for row_cells in ws.iter_rows(min_row=start_row, max_row=end_row, max_col=max_col):
+                for cell in row_cells:
+                    cell.style = current_style
+
+        style_header(ws, max_col, bold_header)
+
+        # 自适应列宽（直接按DataFrame内容计算，无需逐个读取单元格）
+        for col, width in enumerate(calc_column_widths(df), 1):
+            ws.column_dimensions[get_column_letter(col)].width = width * width_factor
+
+def write_type_table(df, file_path, sheet_name, width_factor, bold_header=False):
+    """
+    生成去重类型表：奇偶行交替颜色（偶数行浅灰，奇数行白色）
+    :param df: 去重后的类型数据
+    :param file_path: 输出文件路径
+    :param sheet_name: 工作表名称
+    :param width_factor: 列宽系数（显示宽度 × 系数）
+    :param bold_header: 表头是否加粗
+    """
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+        wb = writer.book
+        ws = writer.sheets[sheet_name]
+        max_row, max_col = ws.max_row, ws.max_column
+
+        styles = build_named_styles('type_table')
+        for style in styles:
+            wb.add_named_style(style)
+        # 从第2行开始（第1行是表头），按行批量取出单元格
+        for row, row_cells in enumerate(ws.iter_rows(min_row=2, max_row=max_row, max_col=max_col), 2):
+            current_style = styles[0 if row % 2 == 0 else 1].name
+            for cell in row_cells:
+                cell.style = current_style
+
+        style_header(ws, max_col, bold_header)
+
+        for col, width in enumerate(calc_column_widths(df), 1):
+            ws.column_dimensions[get_column_letter(col)].width = width * width_factor
+
+if __name__ == "__main__":
+    # 同一进程依次处理BOM自采器件与ModAcc配件清单，共享一次导入开销
+    from extract_bom_components import extract_and_format_bom
+    from modacc_accessory_processor import extract_and_format_accessory
+
+    extract_and_format_bom()
+    extract_and_format_accessory()
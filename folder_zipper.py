@@ -9,56 +9,85 @@
 
 import os
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 
-def batch_compress_folders():
+# 自身已压缩的文件格式（xlsx/docx本身即为zip包，图片/压缩包等同理），再次DEFLATE压缩几乎无收益却消耗大量CPU，直接存储
+COMPRESSED_EXTENSIONS = ('.xlsx', '.docx', '.pptx', '.pdf', '.png', '.jpg', '.jpeg', '.gif',
+                         '.zip', '.rar', '.7z', '.gz', '.mp4')
+
+def compress_folder(item, item_path, current_dir):
     """
-    批量压缩当前目录下的所有直接子文件夹，压缩包名称与文件夹名称一致
+    将单个文件夹压缩为同名ZIP压缩包（供进程池并行调用，日志以列表形式返回，由主进程按顺序输出）
+    :param item: 文件夹名称
+    :param item_path: 文件夹完整路径
+    :param current_dir: 当前工作目录（压缩包存放位置，也是压缩包内相对路径的基准）
+    :return: 该文件夹的处理日志列表
     """
-    # 获取当前工作目录
-    current_dir = os.getcwd()
-    print(f"当前操作目录：{current_dir}")
+    messages = []
+    # 压缩包名称：文件夹名 + .zip（与文件夹同名）
+    zip_filename = f"{item}.zip"
+    zip_filepath = os.path.join(current_dir, zip_filename)
+
+    # 检查压缩包是否已存在，避免覆盖
+    if os.path.exists(zip_filepath):
+        messages.append(f"⚠️  压缩包 {zip_filename} 已存在，跳过压缩")
+        return messages
+
+    # 处理空文件夹（只需判断是否存在第一个条目）
+    with os.scandir(item_path) as it:
+        is_empty = next(it, None) is None
+    if is_empty:
+        messages.append(f"⚠️  文件夹 {item} 为空，创建空压缩包")
 
-    # 遍历当前目录下的所有条目
-    for item in os.listdir(current_dir):
-        # 拼接完整路径
-        item_path = os.path.join(current_dir, item)
+    try:
+        # 创建ZIP压缩包（'w'表示写入，压缩级别6为平衡压缩率和速度）
+        with zipfile.ZipFile(zip_filepath, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zipf:
+            # 递归遍历文件夹内的所有文件和子文件夹
+            for root, dirs, files in os.walk(item_path):
+                # 对每个文件进行处理
+                for file in files:
+                    # 文件完整路径
+                    file_path = os.path.join(root, file)
+                    # 压缩包内的相对路径（保持原文件夹结构）
+                    arcname = os.path.relpath(file_path, current_dir)
+                    # 将文件添加到压缩包（已压缩格式直接存储，其余文件DEFLATE压缩）
+                    if file.lower().endswith(COMPRESSED_EXTENSIONS):
+                        zipf.write(file_path, arcname=arcname, compress_type=zipfile.ZIP_STORED)
+                    else:
+                        zipf.write(file_path, arcname=arcname)
 
-        # 仅处理直接子文件夹（排除文件、隐藏文件夹）
-        if os.path.isdir(item_path) and not item.startswith('.'):
-            # 压缩包名称：文件夹名 + .zip（与文件夹同名）
-            zip_filename = f"{item}.zip"
-            zip_filepath = os.path.join(current_dir, zip_filename)
+        messages.append(f"✅  成功压缩：{item} → {zip_filename}")
 
-            # 检查压缩包是否已存在，避免覆盖
-            if os.path.exists(zip_filepath):
-                print(f"⚠️  压缩包 {zip_filename} 已存在，跳过压缩")
-                continue
+    except Exception as e:
+        messages.append(f"❌  压缩 {item} 失败：{str(e)}")
+        # 若压缩失败，删除已创建的空压缩包
+        if os.path.exists(zip_filepath):
+            os.remove(zip_filepath)
 
-            # 处理空文件夹
-            if not os.listdir(item_path):
-                print(f"⚠️  文件夹 {item} 为空，创建空压缩包")
+    return messages
 
-            try:
-                # 创建ZIP压缩包（'w'表示写入，压缩级别6为平衡压缩率和速度）
-                with zipfile.ZipFile(zip_filepath, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zipf:
-                    # 递归遍历文件夹内的所有文件和子文件夹
-                    for root, dirs, files in os.walk(item_path):
-                        # 对每个文件进行处理
-                        for file in files:
-                            # 文件完整路径
-                            file_path = os.path.join(root, file)
-                            # 压缩包内的相对路径（保持原文件夹结构）
-                            arcname = os.path.relpath(file_path, current_dir)
-                            # 将文件添加到压缩包
-                            zipf.write(file_path, arcname=arcname)
+def batch_compress_folders():
+    """
+    批量压缩当前目录下的所有直接子文件夹，压缩包名称与文件夹名称一致
+    """
+    # 获取当前工作目录
+    current_dir = os.getcwd()
+    print(f"当前操作目录：{current_dir}")
 
-                print(f"✅  成功压缩：{item} → {zip_filename}")
+    # 收集当前目录下的所有直接子文件夹（排除文件、隐藏文件夹）
+    # scandir自带条目类型信息，无需逐个stat判断是否为文件夹
+    with os.scandir(current_dir) as it:
+        folders = [(entry.name, entry.path) for entry in it
+                   if entry.is_dir() and not entry.name.startswith('.')]
+    if not folders:
+        return
 
-            except Exception as e:
-                print(f"❌  压缩 {item} 失败：{str(e)}")
-                # 若压缩失败，删除已创建的空压缩包
-                if os.path.exists(zip_filepath):
-                    os.remove(zip_filepath)
+    # 各文件夹相互独立，使用进程池并行压缩；按提交顺序取回日志，保证输出顺序稳定
+    with ProcessPoolExecutor(max_workers=min(len(folders), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(compress_folder, item, item_path, current_dir) for item, item_path in folders]
+        for future in futures:
+            for message in future.result():
+                print(message)
 
 if __name__ == "__main__":
     batch_compress_folders()
@@ -15,6 +15,10 @@ from pathlib import Path
 from openpyxl import load_workbook
 from openpyxl.styles import Alignment, Border, Side
 
+# -------------------------- 核心修改：正则同时匹配[-_]分隔符、[Vv]大小写版本号 --------------------------
+# 匹配任意名称 + 分隔符(-/_) + 版本号(v/V+数字) 结尾的文件夹（模块级预编译，只编译一次）
+MODULE_FOLDER_PATTERN = re.compile(r'.+[-_][Vv]\d+\.\d+(\.\d+)?$')
+
 thin_border = Border(
     left=Side(style='thin'), right=Side(style='thin'),
     top=Side(style='thin'), bottom=Side(style='thin')
@@ -22,14 +26,16 @@ thin_border = Border(
 
 def gen_module_accessory_lists():
     root_dir = Path(os.getcwd())
-    # -------------------------- 核心修改：正则同时匹配[-_]分隔符、[Vv]大小写版本号 --------------------------
-    # 匹配任意名称 + 分隔符(-/_) + 版本号(v/V+数字) 结尾的文件夹
-    module_folder_pattern = re.compile(r'.+[-_][Vv]\d+\.\d+(\.\d+)?$')
     list_columns = ["No.", "Quantity", "Manufacturer Part", "Price", "Value", "淘宝链接", "下单配置", "最小起订量"]
 
-    for folder in root_dir.iterdir():
+    # scandir自带条目类型信息，判断是否为文件夹时无需额外stat
+    with os.scandir(root_dir) as it:
+        entries = list(it)
+
+    for entry in entries:
         # 同时筛选“模块”或“扩展板”的文件夹，排除.idea
-        if folder.is_dir() and module_folder_pattern.match(folder.name) and ".idea" not in folder.name:
+        if entry.is_dir() and MODULE_FOLDER_PATTERN.match(entry.name) and ".idea" not in entry.name:
+            folder = Path(entry.path)
             # 文件名格式：ModAcc_文件夹完整名字.xlsx
             list_filename = f"ModAcc_{folder.name}.xlsx"
             list_filepath = folder / list_filename
@@ -9,11 +9,63 @@
 import pandas as pd
 import os
 import re
+import hashlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fonts import DEFAULT_FONT
 import numpy as np
 
+# 文本列类型：安装pyarrow时显式使用Arrow存储（pandas 2.x的'string'默认为Python对象存储，pandas 3.0起才默认Arrow）
+# 未安装pyarrow时回退为普通string类型
+STRING_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') is not None else 'string'
+
+# 解析结果缓存目录（位于根目录下，隐藏文件夹）及缓存格式版本（处理逻辑变化时递增，使旧缓存失效）
+CACHE_DIR_NAME = '.bom_cache'
+CACHE_VERSION = 4
+# 单个BOM文件处理结果的标准字段（顺序即输出列顺序）
+RESULT_COLUMNS = ['模块名称', 'Designator', 'Supplier Part', '元器件类型', 'Manufacturer Part', 'Manufacturer']
+# BOM文件名前缀（小写，兼容BOM/B0M/bom等大小写及数字0写法）
+BOM_FILE_PREFIXES = frozenset({'bom', 'b0m'})
+# 中文字符正则（模块级预编译）：列宽计算时中文按2字符计
+CJK_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+# 自采标识列名变体映射（判定非自采器件用）
+SELF_PURCHASE_COLUMN_MAPPING = {
+    'taobao_link': ['淘宝链接', '淘宝网址', 'taobao', 'taobao url'],
+    'order_config': ['下单配置', '规格', '配置', 'spec', 'specification'],
+    'min_order': ['最小起订量', '订购量', '最小订购量', 'moq', 'min order']
+}
+# 核心字段列名变体映射
+FIELD_MAPPING = {
+    'designator': ['designator', '位号', '元件位号'],
+    'supplier_part': ['supplier part', '立创编号', '供应商编号', 'supplier p/n'],
+    'manufacturer_part': ['manufacturer part', '器件型号', '型号', 'mfr p/n', 'manufacturer p/n'],
+    'manufacturer': ['manufacturer', '制造商', '品牌']
+}
+# 所有列名变体（小写），读取BOM时据此筛选需要解析的列
+MAPPED_COLUMN_VARIANTS = tuple(
+    variant.lower()
+    for mapping in (SELF_PURCHASE_COLUMN_MAPPING, FIELD_MAPPING)
+    for variants in mapping.values()
+    for variant in variants
+)
+# 无效字符正则（模块级预编译）：全角空格、制表符、换行符
+INVALID_CHAR_PATTERN = re.compile(r'[\u3000\t\n\r]')
+# 位号前缀分类规则（按顺序匹配，较长前缀在前：LED/SW/USB/CN 需先于 R/C/U 判断）
+COMPONENT_PREFIX_RULES = [
+    (('LED',), '二极管'),
+    (('SW',), '开关'),
+    (('USB', 'CN', 'J'), '连接器'),
+    (('R',), '电阻'),
+    (('C',), '电容'),
+    (('Q',), '晶体管'),
+    (('U',), '集成电路')
+]
+
 def find_bom_files(root_dir):
     """
     查找同级文件夹下子文件夹中所有BOM/B0M开头的Excel文件
@@ -27,187 +79,159 @@ def find_bom_files(root_dir):
         if dirpath == root_dir:
             continue
         for filename in filenames:
-            # 匹配BOM/B0M开头的Excel文件（.xlsx/.xls）
-            if re.match(r'^[Bb][0Oo][Mm]', filename, re.IGNORECASE) and filename.endswith(('.xlsx', '.xls')):
+            # 匹配BOM/B0M开头的Excel文件（.xlsx/.xls）：取前3个字符转小写后查集合，无需正则
+            if filename[:3].lower() in BOM_FILE_PREFIXES and filename.endswith(('.xlsx', '.xls')):
                 bom_files.append(os.path.join(dirpath, filename))
     return bom_files
 
 
-def clean_invalid_content(val):
+def clean_series(series):
     """
-    清理无效内容（NaN、空白字符串、全角空格、制表符、换行符）
-    :param val: 待清理的值
-    :return: 清理后的值，无效则返回None
+    清理整列无效内容（NaN、空白字符串、全角空格、制表符、换行符），按列向量化处理
+    :param series: 待清理的列
+    :return: 清理后的列（STRING_DTYPE类型），无效值为pd.NA
     """
-    if pd.isna(val):
-        return None
-    # 转换为字符串并清理
-    str_val = str(val).strip()
-    # 移除全角空格、制表符、换行符
-    str_val = str_val.replace('\u3000', '').replace('\t', '').replace('\n', '').replace('\r', '')
-    return str_val if str_val else None
+    # 一次正则替换移除全角空格、制表符、换行符，再去除首尾空白，空字符串视为无效
+    # 传入正则字符串而非编译对象：Arrow存储的列可直接用Arrow自带的正则内核，不回退到逐元素处理
+    return (series.astype(STRING_DTYPE)
+            .str.replace(INVALID_CHAR_PATTERN.pattern, '', regex=True)
+            .str.strip()
+            .replace('', pd.NA))
 
 
-def match_column_name(df_columns, target_names):
+def build_col_index(df_columns):
     """
-    匹配列名（支持变体）
+    构建列名索引（每个文件只计算一次小写列名，供多次列名匹配复用）
     :param df_columns: DataFrame列名列表
+    :return: [(原列名, 小写列名), ...]
+    """
+    return [(col, col.lower()) for col in df_columns]
+
+
+def match_column_name(col_index, target_names):
+    """
+    匹配列名（支持变体）
+    :param col_index: build_col_index生成的列名索引
     :param target_names: 目标列名列表（变体）
     :return: 匹配到的列名，无则返回None
     """
-    df_cols_lower = [col.lower() for col in df_columns]
     for target in target_names:
         target_lower = target.lower()
-        for idx, col_lower in enumerate(df_cols_lower):
+        for col, col_lower in col_index:
             if target_lower in col_lower:
-                return df_columns[idx]
+                return col
     return None
 
 
-def judge_non_self_purchase(df):
+def is_mapped_column(column):
+    """
+    判断列是否可能被列名匹配用到（列名包含任一变体，与match_column_name的匹配规则一致）
+    :param column: 原始列名
+    :return: 需要读取返回True
+    """
+    column_lower = str(column).lower()
+    return any(variant in column_lower for variant in MAPPED_COLUMN_VARIANTS)
+
+
+def judge_non_self_purchase(df, col_index, file_path):
     """
     判定非自采器件（淘宝链接、下单配置、最小起订量均无有效内容）
-    :param df: 原始BOM DataFrame
+    :param df: 已清理的BOM DataFrame（无效内容为pd.NA）
+    :param col_index: df的列名索引（build_col_index生成）
+    :param file_path: BOM文件路径（用于提取模块名称）
     :return: 非自采器件DataFrame
     """
-    # 列名变体映射
-    column_mapping = {
-        'taobao_link': ['淘宝链接', '淘宝网址', 'taobao', 'taobao url'],
-        'order_config': ['下单配置', '规格', '配置', 'spec', 'specification'],
-        'min_order': ['最小起订量', '订购量', '最小订购量', 'moq', 'min order']
-    }
-
     # 匹配列名
-    taobao_col = match_column_name(df.columns, column_mapping['taobao_link'])
-    order_col = match_column_name(df.columns, column_mapping['order_config'])
-    min_order_col = match_column_name(df.columns, column_mapping['min_order'])
-
-    # 复制DataFrame用于处理
-    df_copy = df.copy()
-
-    # 清理关键列内容
-    if taobao_col:
-        df_copy['clean_taobao'] = df_copy[taobao_col].apply(clean_invalid_content)
-    else:
-        df_copy['clean_taobao'] = None  # 未找到列视为无内容
-
-    if order_col:
-        df_copy['clean_order'] = df_copy[order_col].apply(clean_invalid_content)
-    else:
-        df_copy['clean_order'] = None
-
-    if min_order_col:
-        df_copy['clean_min_order'] = df_copy[min_order_col].apply(clean_invalid_content)
-    else:
-        df_copy['clean_min_order'] = None
-
-    # 判定非自采器件（三列均无有效内容）
-    non_self_purchase = df_copy[
-        (df_copy['clean_taobao'].isna()) &
-        (df_copy['clean_order'].isna()) &
-        (df_copy['clean_min_order'].isna())
-        ].copy()
-
-    # 添加模块名称（从文件名提取）
-    if 'file_path' in df_copy.columns:
-        non_self_purchase['模块名称'] = non_self_purchase['file_path'].apply(
-            lambda x: os.path.basename(x).replace('.xlsx', '').replace('.xls', '')
-        )
+    taobao_col = match_column_name(col_index, SELF_PURCHASE_COLUMN_MAPPING['taobao_link'])
+    order_col = match_column_name(col_index, SELF_PURCHASE_COLUMN_MAPPING['order_config'])
+    min_order_col = match_column_name(col_index, SELF_PURCHASE_COLUMN_MAPPING['min_order'])
+
+    # 判定非自采器件（三列均无有效内容）：直接在原表上构建布尔掩码，不复制整表、不附加临时清理列
+    non_self_mask = pd.Series(True, index=df.index)
+    for col in (taobao_col, order_col, min_order_col):
+        # 未找到的列视为无内容，不参与判定
+        if col:
+            non_self_mask &= df[col].isna()
+    # 只复制筛选后的子集（后续需在其上添加列）
+    non_self_purchase = df.loc[non_self_mask].copy()
+
+    # 添加模块名称（从文件名提取：同一文件所有行相同，只计算一次后整列赋值）
+    # 与其余清理后的列同为STRING_DTYPE，使直接处理与读取缓存得到的结果类型一致
+    module_name = os.path.splitext(os.path.basename(file_path))[0]
+    non_self_purchase['模块名称'] = pd.Series(module_name, index=non_self_purchase.index, dtype=STRING_DTYPE)
 
     return non_self_purchase
 
 
-def classify_component(designator):
+def classify_components(designators):
     """
-    按位号前缀分类元器件（大分类）
-    :param designator: 位号（Designator）
-    :return: 元器件大分类
+    按位号前缀分类元器件（大分类），整列向量化判断
+    :param designators: 位号（Designator）列
+    :return: 元器件大分类列（与输入索引一致）
     """
-    if pd.isna(designator):
-        return '未知（无位号）'
+    designator_str = designators.astype(STRING_DTYPE).str.strip().str.upper()
 
-    designator_str = str(designator).strip().upper()
+    # 按规则顺序逐条生成前缀布尔掩码，np.select取第一个命中的分类
+    conditions = [designator_str.str.startswith(prefixes).fillna(False).to_numpy(dtype=bool)
+                  for prefixes, _ in COMPONENT_PREFIX_RULES]
+    choices = [component_type for _, component_type in COMPONENT_PREFIX_RULES]
+    component_types = pd.Series(np.select(conditions, choices, default='其他'), index=designators.index)
 
-    # 大分类规则
-    if designator_str.startswith('R'):
-        return '电阻'
-    elif designator_str.startswith('C'):
-        return '电容'
-    elif designator_str.startswith('LED'):
-        return '二极管'
-    elif designator_str.startswith('Q'):
-        return '晶体管'
-    elif designator_str.startswith('U'):
-        return '集成电路'
-    elif designator_str.startswith('SW'):
-        return '开关'
-    elif any(prefix in designator_str for prefix in ['J', 'CN', 'USB']):
-        return '连接器'
-    else:
-        return '其他'
+    # 无位号单独标记
+    return component_types.where(designator_str.notna(), '未知（无位号）')
 
 
 def process_bom_file(file_path):
     """
     处理单个BOM文件
     :param file_path: BOM文件路径
-    :return: 处理后的非自采器件DataFrame
+    :return: 处理后的非自采器件DataFrame（无非自采器件时为空表，处理出错时为None）
     """
     try:
         # 读取Excel文件（支持多sheet，取第一个sheet）
-        df = pd.read_excel(file_path, sheet_name=0)
-        df['file_path'] = file_path  # 记录文件路径
+        # 只解析可能被匹配到的列（列名包含任一变体），其余列不转为DataFrame数据
+        df = pd.read_excel(file_path, sheet_name=0, usecols=is_mapped_column)
+        # 一列都未匹配到时，按列筛选读取会得到无行的空表；改为读取全部列以保留各行
+        # （这些行均会归为缺少位号等信息的特殊器件，提示该BOM格式异常）
+        if df.columns.empty:
+            df = pd.read_excel(file_path, sheet_name=0)
+        # 读取后统一清理一次：各列转为STRING_DTYPE（安装pyarrow时为Arrow存储）并去除无效内容
+        # 判定、分类与结果输出都直接使用清理后的列，不再重复清理
+        df = df.apply(clean_series)
+        # 列名小写索引只构建一次，判定与字段匹配共用
+        col_index = build_col_index(df.columns)
 
         # 1. 判定非自采器件
-        non_self_df = judge_non_self_purchase(df)
+        non_self_df = judge_non_self_purchase(df, col_index, file_path)
         if non_self_df.empty:
-            return None
+            # 返回空表而非None，与出错区分开，使“全部为自采器件”的文件也能被缓存
+            return pd.DataFrame(columns=RESULT_COLUMNS, dtype=STRING_DTYPE)
 
         # 2. 匹配核心字段（处理列名变体）
-        field_mapping = {
-            'designator': ['designator', '位号', '元件位号'],
-            'supplier_part': ['supplier part', '立创编号', '供应商编号', 'supplier p/n'],
-            'manufacturer_part': ['manufacturer part', '器件型号', '型号', 'mfr p/n', 'manufacturer p/n'],
-            'manufacturer': ['manufacturer', '制造商', '品牌']
-        }
-
         # 匹配各字段列名
-        designator_col = match_column_name(df.columns, field_mapping['designator']) or 'Designator'
-        supplier_part_col = match_column_name(df.columns, field_mapping['supplier_part']) or 'Supplier Part'
-        manufacturer_part_col = match_column_name(df.columns, field_mapping['manufacturer_part']) or 'Manufacturer Part'
-        manufacturer_col = match_column_name(df.columns, field_mapping['manufacturer']) or 'Manufacturer'
+        designator_col = match_column_name(col_index, FIELD_MAPPING['designator']) or 'Designator'
+        supplier_part_col = match_column_name(col_index, FIELD_MAPPING['supplier_part']) or 'Supplier Part'
+        manufacturer_part_col = match_column_name(col_index, FIELD_MAPPING['manufacturer_part']) or 'Manufacturer Part'
+        manufacturer_col = match_column_name(col_index, FIELD_MAPPING['manufacturer']) or 'Manufacturer'
 
-        # 确保必要列存在（不存在则设为NaN）
+        # 确保必要列存在（不存在则设为空的string列，与清理后的列类型一致）
         for col in [designator_col, supplier_part_col, manufacturer_part_col, manufacturer_col]:
             if col not in non_self_df.columns:
-                non_self_df[col] = np.nan
+                non_self_df[col] = pd.Series(pd.NA, index=non_self_df.index, dtype=STRING_DTYPE)
 
         # 3. 分类元器件
-        non_self_df['元器件类型'] = non_self_df[designator_col].apply(classify_component)
-
-        # 4. 提取核心字段
-        result_df = non_self_df[[
-            '模块名称',
-            designator_col,
-            supplier_part_col,
-            '元器件类型',
-            manufacturer_part_col,
-            manufacturer_col
-        ]].copy()
-
-        # 重命名为标准字段名
-        result_df.columns = [
-            '模块名称',
-            'Designator',
-            'Supplier Part',
-            '元器件类型',
-            'Manufacturer Part',
-            'Manufacturer'
-        ]
-
-        # 清理字段内容
-        for col in result_df.columns:
-            result_df[col] = result_df[col].apply(clean_invalid_content)
+        non_self_df['元器件类型'] = classify_components(non_self_df[designator_col]).astype(STRING_DTYPE)
+
+        # 4. 提取核心字段：按标准字段名直接由各列底层数组构建结果表（无需先选列复制再重命名）
+        # 使用.array而非.to_numpy()，保留string类型
+        result_df = pd.DataFrame({
+            '模块名称': non_self_df['模块名称'].array,
+            'Designator': non_self_df[designator_col].array,
+            'Supplier Part': non_self_df[supplier_part_col].array,
+            '元器件类型': non_self_df['元器件类型'].array,
+            'Manufacturer Part': non_self_df[manufacturer_part_col].array,
+            'Manufacturer': non_self_df[manufacturer_col].array
+        })
 
         return result_df
 
@@ -216,18 +240,94 @@ def process_bom_file(file_path):
         return None
 
 
+def get_cache_path(file_path, cache_dir):
+    """
+    计算BOM文件对应的缓存文件路径（以文件绝对路径、修改时间、大小及缓存版本为键，文件变化后自动失效）
+    :param file_path: BOM文件路径
+    :param cache_dir: 缓存目录
+    :return: 缓存文件路径；无法获取文件信息（如失效的符号链接、文件已被删除）时返回None
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    key = f"{CACHE_VERSION}|{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def process_bom_file_cached(file_path, cache_dir):
+    """
+    处理单个BOM文件（带持久化缓存：文件未变化时直接读取上次的处理结果，跳过Excel解析）
+    缓存为纯数据的JSON文件（不使用pickle，读取缓存不会执行任何代码）；结果各列均为文本，读回后恢复为STRING_DTYPE
+    :param file_path: BOM文件路径
+    :param cache_dir: 缓存目录
+    :return: 处理后的非自采器件DataFrame
+    """
+    cache_path = get_cache_path(file_path, cache_dir)
+    # 无法计算缓存键时不使用缓存，由process_bom_file输出错误信息
+    if cache_path is None:
+        return process_bom_file(file_path)
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_json(cache_path, orient='split', dtype=False,
+                                convert_dates=False).astype(STRING_DTYPE)
+        except Exception:
+            # 缓存损坏时，重新解析BOM文件
+            pass
+
+    result_df = process_bom_file(file_path)
+    # 只缓存成功处理的结果（含无非自采器件的空表；出错的文件下次仍重新处理）
+    if result_df is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            result_df.to_json(cache_path, orient='split', index=False, force_ascii=False)
+        except OSError as e:
+            print(f"写入 {file_path} 的缓存 {cache_path} 失败: {str(e)}")
+    return result_df
+
+
+def prune_cache(cache_dir, used_paths):
+    """
+    删除本次运行未用到的缓存文件（BOM修改、删除或缓存版本变化后遗留的旧缓存），避免缓存目录无限增长
+    :param cache_dir: 缓存目录
+    :param used_paths: 本次运行读取或写入的缓存文件路径集合
+    """
+    if not os.path.isdir(cache_dir):
+        return
+    with os.scandir(cache_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.path not in used_paths:
+                try:
+                    os.remove(entry.path)
+                except OSError as e:
+                    print(f"删除过期缓存 {entry.path} 失败: {str(e)}")
+
+
 def deduplicate_components(all_components):
     """
-    按Supplier Part去重（保留首次出现记录）
-    :param all_components: 所有非自采器件DataFrame
+    按Supplier Part去重（保留首次出现记录），逐文件过滤后再合并，合并结果即为去重后的大小
+    :param all_components: 各BOM文件的非自采器件DataFrame列表（按文件顺序）
     :return: 去重后的DataFrame
     """
-    if all_components.empty:
-        return all_components
-
-    # 按Supplier Part去重，保留首次出现
-    deduplicated = all_components.drop_duplicates(subset=['Supplier Part'], keep='first').copy()
-    return deduplicated
+    seen_parts = set()  # 此前文件中已保留的Supplier Part
+    seen_missing = False  # 此前文件中是否已保留过缺失Supplier Part的记录
+    kept = []
+    for component_df in all_components:
+        supplier_part = component_df['Supplier Part']
+        # 文件内首次出现，且此前文件中未出现过
+        keep_mask = ~supplier_part.duplicated() & ~supplier_part.isin(seen_parts)
+        # 缺失值视为同一个值（与drop_duplicates一致），全部文件中只保留第一条
+        if seen_missing:
+            keep_mask &= supplier_part.notna()
+        kept_df = component_df[keep_mask]
+
+        kept_parts = kept_df['Supplier Part']
+        seen_parts.update(kept_parts.dropna())
+        seen_missing = seen_missing or bool(kept_parts.isna().any())
+        kept.append(kept_df)
+
+    return pd.concat(kept, ignore_index=True)
 
 
 def split_regular_special(components_df):
@@ -237,38 +337,35 @@ def split_regular_special(components_df):
     :param components_df: 去重后的元器件DataFrame
     :return: 常规器件DataFrame、特殊器件DataFrame
     """
-    # 判定特殊器件条件
-    condition1 = components_df['Designator'].isna()  # 缺失位号
-    condition2 = components_df['Supplier Part'].isna()  # 缺失Supplier Part
-    condition3 = components_df['元器件类型'] == '其他'  # 分类为其他
-
-    special_df = components_df[condition1 | condition2 | condition3].copy()
-    regular_df = components_df[~(condition1 | condition2 | condition3)].copy()
+    # 判定特殊器件条件：缺失位号、缺失Supplier Part或分类为其他，掩码只计算一次
+    special_mask = (components_df['Designator'].isna() |
+                    components_df['Supplier Part'].isna() |
+                    (components_df['元器件类型'] == '其他'))
 
+    # 行筛选与列选取合并为一次切片，重命名后直接填充空值为"无"（不再先整表复制再选列）
     # 常规器件：保留核心3列（元器件类型、元器件名字、元器件编号）
-    regular_final = regular_df[[
-        '元器件类型',
-        'Manufacturer Part',  # 元器件名字
-        'Supplier Part'  # 元器件编号
-    ]].copy()
-    regular_final.columns = ['元器件类型', '元器件名字', '元器件编号']
-
+    regular_final = components_df.loc[~special_mask, ['元器件类型', 'Manufacturer Part', 'Supplier Part']].rename(
+        columns={'Manufacturer Part': '元器件名字', 'Supplier Part': '元器件编号'}).fillna('无')
     # 特殊器件：保留模块名称+核心3列
-    special_final = special_df[[
-        '模块名称',
-        '元器件类型',
-        'Manufacturer Part',
-        'Supplier Part'
-    ]].copy()
-    special_final.columns = ['模块名称', '元器件类型', '元器件名字', '元器件编号']
-
-    # 填充空值为"无"
-    regular_final = regular_final.fillna('无')
-    special_final = special_final.fillna('无')
+    special_final = components_df.loc[special_mask, ['模块名称', '元器件类型', 'Manufacturer Part', 'Supplier Part']].rename(
+        columns={'Manufacturer Part': '元器件名字', 'Supplier Part': '元器件编号'}).fillna('无')
 
     return regular_final, special_final
 
 
+def calc_display_width(series):
+    """
+    计算一列内容的最大显示宽度（中文按2字符，英文/数字按1字符），整列向量化计算
+    :param series: 待计算的列
+    :return: 最大显示宽度，空列返回0
+    """
+    text = series.fillna('').astype(str)
+    if text.empty:
+        return 0
+    # 总字符数 + 中文字符数
+    return int((text.str.len() + text.str.count(CJK_CHAR_PATTERN.pattern)).max())
+
+
 def format_excel_file(regular_df, special_df, output_path):
     """
     生成格式化Excel文件
@@ -276,85 +373,67 @@ def format_excel_file(regular_df, special_df, output_path):
     :param special_df: 特殊器件DataFrame
     :param output_path: 输出文件路径
     """
-    # 创建工作簿
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "非自采器件分类汇总"
-
-    # 定义样式
-    # 奇偶行填充色（浅灰#F5F5F5，白色#FFFFFF）
-    gray_fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-    white_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-    # 表头字体
-    header_font = Font(bold=True)
-
-    # 1. 写入常规器件
-    current_row = 1
-    # 常规器件表头
+    # 创建只写工作簿（流式逐行写入，不在内存中保留整张表的单元格对象）
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("非自采器件分类汇总")
+
+    # 定义命名样式（工作簿样式表中只登记一次，单元格按名称引用）
+    # 表头：加粗；数据行：奇偶行填充色（浅灰#F5F5F5，白色#FFFFFF）
+    # 未指定的字体/边框沿用工作簿默认样式，避免写入空的字体、边框记录
+    header_style = NamedStyle(name='header', font=Font(bold=True), border=DEFAULT_BORDER)
+    gray_style = NamedStyle(name='gray_row', font=DEFAULT_FONT, border=DEFAULT_BORDER,
+                            fill=PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid"))
+    white_style = NamedStyle(name='white_row', font=DEFAULT_FONT, border=DEFAULT_BORDER,
+                             fill=PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid"))
+    for style in (header_style, gray_style, white_style):
+        wb.add_named_style(style)
+
     regular_headers = ['元器件类型', '元器件名字', '元器件编号']
-    for col, header in enumerate(regular_headers, 1):
-        cell = ws.cell(row=current_row, column=col, value=header)
-        cell.font = header_font
-
-    current_row += 1
-
-    # 写入常规器件数据
-    for idx, (_, row) in enumerate(regular_df.iterrows(), 1):
-        for col, header in enumerate(regular_headers, 1):
-            ws.cell(row=current_row, column=col, value=row[header])
-        # 设置行颜色
-        fill = gray_fill if idx % 2 == 0 else white_fill
-        for col in range(1, len(regular_headers) + 1):
-            ws.cell(row=current_row, column=col).fill = fill
-        current_row += 1
-
-    # 2. 写入特殊器件（标题+空行分隔）
+    special_headers = ['模块名称', '元器件类型', '元器件名字', '元器件编号']
+    special_title = "特殊非自采器件（含模块信息）"
+
+    # 1. 自适应列宽（只写模式下须在写入数据前设置）：直接按DataFrame整列向量化计算
+    # 常规数据、特殊器件标题/表头/数据均按从A列起的位置参与比较
+    width_blocks = [regular_df[regular_headers]]
+    final_headers = regular_headers
     if not special_df.empty:
-        # 空行
-        current_row += 1
-        # 特殊器件标题
-        special_title = "特殊非自采器件（含模块信息）"
-        ws.cell(row=current_row, column=1, value=special_title).font = header_font
-        current_row += 1
-
-        # 特殊器件表头
-        special_headers = ['模块名称', '元器件类型', '元器件名字', '元器件编号']
-        for col, header in enumerate(special_headers, 1):
-            cell = ws.cell(row=current_row, column=col, value=header)
-            cell.font = header_font
-
-        current_row += 1
-
-        # 写入特殊器件数据
-        for idx, (_, row) in enumerate(special_df.iterrows(), 1):
-            for col, header in enumerate(special_headers, 1):
-                ws.cell(row=current_row, column=col, value=row[header])
-            # 设置行颜色
-            fill = gray_fill if idx % 2 == 0 else white_fill
-            for col in range(1, len(special_headers) + 1):
-                ws.cell(row=current_row, column=col).fill = fill
-            current_row += 1
-
-    # 3. 自适应列宽
-    def auto_adjust_column_width(ws, headers):
-        for col, header in enumerate(headers, 1):
-            # 计算列内容最大长度
-            max_length = len(str(header))
-            for row in range(2, ws.max_row + 1):
-                cell_value = str(ws.cell(row=row, column=col).value)
-                # 中文按2字符，英文/数字按1字符计算
-                char_count = sum(2 if '\u4e00' <= c <= '\u9fff' else 1 for c in cell_value)
-                if char_count > max_length:
-                    max_length = char_count
-            # 预留10%边距
-            adjusted_width = max_length * 1.1
-            ws.column_dimensions[chr(64 + col)].width = adjusted_width
-
-    # 调整常规器件列宽
-    auto_adjust_column_width(ws, regular_headers)
-    # 若有特殊器件，调整特殊器件列宽（取最大宽度）
+        width_blocks += [pd.DataFrame([[special_title]]), pd.DataFrame([special_headers]), special_df[special_headers]]
+        # 有特殊器件时，以特殊器件表头为基准（取最大宽度）
+        final_headers = special_headers
+    for col, header in enumerate(final_headers, 1):
+        # 计算列内容最大长度
+        max_length = len(str(header))
+        for block in width_blocks:
+            if col <= block.shape[1]:
+                max_length = max(max_length, calc_display_width(block.iloc[:, col - 1]))
+        # 预留10%边距
+        ws.column_dimensions[chr(64 + col)].width = max_length * 1.1
+
+    # 2. 逐行流式写入：DataFrame按普通元组逐行取出（不构造每行Series），每行一次append，
+    # 样式在创建单元格时一并设置，已写出的行不在内存中保留
+    def append_row(values, style_name):
+        row_cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style_name
+            row_cells.append(cell)
+        ws.append(row_cells)
+
+    def append_data_rows(rows):
+        # rows为普通元组序列；奇偶行交替颜色（第1条数据为白色）
+        for idx, values in enumerate(rows, 1):
+            append_row(values, gray_style.name if idx % 2 == 0 else white_style.name)
+
+    # 常规器件：表头 + 数据行
+    append_row(regular_headers, header_style.name)
+    append_data_rows(regular_df[regular_headers].itertuples(index=False, name=None))
+
+    # 特殊器件：空行 + 标题 + 表头 + 数据行
     if not special_df.empty:
-        auto_adjust_column_width(ws, special_headers)
+        ws.append([])
+        append_row((special_title,), header_style.name)
+        append_row(special_headers, header_style.name)
+        append_data_rows(special_df[special_headers].itertuples(index=False, name=None))
 
     # 保存文件
     wb.save(output_path)
@@ -368,6 +447,7 @@ def main():
     # 1. 配置参数
     root_dir = os.path.dirname(os.path.abspath(__file__))  # 当前脚本所在目录
     output_excel = os.path.join(root_dir, "非自采器件分类汇总表.xlsx")
+    cache_dir = os.path.join(root_dir, CACHE_DIR_NAME)
 
     # 2. 查找所有BOM文件
     print("正在查找BOM文件...")
@@ -377,25 +457,37 @@ def main():
         return
     print(f"找到 {len(bom_files)} 个BOM文件")
 
-    # 3. 处理所有BOM文件
+    # 3. 处理所有BOM文件（各文件相互独立，使用进程池并行处理）
     all_components = []
     print("正在处理BOM文件...")
-    for file in bom_files:
-        print(f"处理: {os.path.basename(file)}")
-        component_df = process_bom_file(file)
-        if component_df is not None and not component_df.empty:
-            all_components.append(component_df)
+    with ProcessPoolExecutor(max_workers=min(len(bom_files), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(process_bom_file_cached, file, cache_dir) for file in bom_files]
+        # 按提交顺序取回结果：合并顺序与文件顺序一致，后续去重“保留首次出现”的结果不变
+        # 各文件在子进程中并行处理，子进程输出的信息可能早于对应的“处理:”行，因此其中均带有文件路径
+        for file, future in zip(bom_files, futures):
+            print(f"处理: {os.path.basename(file)}")
+            # 单个文件在子进程中出现未处理的异常（含进程池异常终止）时，只跳过该文件，不影响其余结果
+            try:
+                component_df = future.result()
+            except Exception as e:
+                print(f"处理文件 {file} 时出错: {str(e)}")
+                continue
+            if component_df is not None and not component_df.empty:
+                all_components.append(component_df)
+
+    # 清理本次未用到的旧缓存（与读取缓存时按相同方式计算路径，无法获取文件信息的BOM不计入）
+    used_cache_paths = {get_cache_path(file, cache_dir) for file in bom_files}
+    used_cache_paths.discard(None)
+    prune_cache(cache_dir, used_cache_paths)
 
     if not all_components:
         print("未找到任何非自采器件")
         return
 
-    # 合并所有数据
-    combined_df = pd.concat(all_components, ignore_index=True)
-    print(f"共找到 {len(combined_df)} 个非自采器件（去重前）")
+    print(f"共找到 {sum(len(component_df) for component_df in all_components)} 个非自采器件（去重前）")
 
-    # 4. 去重
-    deduplicated_df = deduplicate_components(combined_df)
+    # 4. 去重（逐文件去重后合并，无需先合并出去重前的完整大表）
+    deduplicated_df = deduplicate_components(all_components)
     print(f"去重后剩余 {len(deduplicated_df)} 个非自采器件")
 
     # 5. 区分常规和特殊器件